@@ -1,5 +1,7 @@
+import os
 from pathlib import Path
-from subprocess import run
+from subprocess import run, DEVNULL, PIPE
+from concurrent.futures import ThreadPoolExecutor
 
 """
 input_files: 输出的视频文件列表
@@ -11,14 +13,44 @@ video_dir = Path("/Users/ender/work/PRJZ/videos")
 input_files = sorted(video_dir.glob("2024-1*.mov"))
 output_files = [video_dir / f"{f.stem}_compressed.mp4" for f in input_files]
 
-for input_file, output_file in zip(input_files, output_files):
-    print(f"Precossing {input_file} to {output_file}")
-    run([
+# 每个 ffmpeg 进程使用的线程数，并发数按 CPU 核数计算，使总线程数约等于核数
+threads_per_ffmpeg = 2
+max_workers = max(1, (os.cpu_count() or 1) // threads_per_ffmpeg)
+
+
+def detect_codec():
+    """优先使用 macOS 的 VideoToolbox 硬件编码，不可用时回退到 libx264"""
+    encoders = run(
+        ["ffmpeg", "-hide_banner", "-encoders"], stdout=PIPE, stderr=DEVNULL, stdin=DEVNULL
+    ).stdout
+    if b"h264_videotoolbox" in encoders:
+        return "h264_videotoolbox"
+    return "libx264"
+
+
+def build_cmd(input_file, output_file, codec):
+    if codec == "h264_videotoolbox":
+        video_args = [
+            "-c:v", "h264_videotoolbox",
+            "-q:v", "55",
+            "-tag:v", "avc1",
+            "-allow_sw", "1",
+        ]
+    else:
+        video_args = [
+            "-vcodec", "libx264",
+            "-crf", "23",
+            "-preset", "medium",
+            "-threads", str(threads_per_ffmpeg),
+        ]
+
+    return [
         "ffmpeg",
+        "-nostdin",
+        "-hide_banner",
+        "-loglevel", "error",
         "-i", str(input_file),
-        "-vcodec", "libx264",
-        "-crf", "23",
-        "-preset", "medium",
+        *video_args,
         "-acodec", "aac",
         "-b:a", "192k",
         "-c:s", "copy",
@@ -26,4 +58,17 @@ for input_file, output_file in zip(input_files, output_files):
         # "-map", "0:s:3",
         # "-map", "0:s:4",
         str(output_file)
-    ])
+    ]
+
+
+codec = detect_codec()
+
+
+def _encode(input_file, output_file):
+    print(f"Precossing {input_file} to {output_file}")
+    # ffmpeg 在子进程中运行，线程池即可并发，不需要额外的 Python 进程
+    run(build_cmd(input_file, output_file, codec), stdin=DEVNULL)
+
+
+with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    list(executor.map(_encode, input_files, output_files))
@@ -3,10 +3,9 @@
 This script is used to convert a video to a gif by using ffmpeg.
 In addition, it can crop and cut the video before converting it to a gif.
 """
-from typing import Tuple, List
+from typing import Tuple
 import subprocess
 import argparse
-import json
 
 
 def parse_coordinates(coordinates: str) -> Tuple[float]:
@@ -56,7 +55,7 @@ def parse_args():
 def calculate_crop_parameters(
         top_left: Tuple[float], bottom_right: Tuple[float],
         video_size: Tuple[int], fps: int
-) -> List[str]:
+) -> str:
     if top_left[0] > bottom_right[0] or top_left[1] > bottom_right[1]:
         raise ValueError("top_left should be smaller than bottom_right")
 
@@ -72,7 +71,7 @@ def calculate_crop_parameters(
     h = int(bottom_right[1] - top_left[1])
     x = int(top_left[0])
     y = int(top_left[1])
-    return ["-vf", f"fps={fps},crop={w}:{h}:{x}:{y}"]
+    return f"fps={fps},crop={w}:{h}:{x}:{y}"
 
 
 def get_video_size(ffmpeg: str, video_path: str) -> Tuple[int]:
@@ -83,14 +82,13 @@ def get_video_size(ffmpeg: str, video_path: str) -> Tuple[int]:
         '-v', 'error',
         '-select_streams', 'v:0',
         '-show_entries', 'stream=width,height',
-        '-of', 'json',
+        '-of', 'csv=p=0',
         video_path
     ]
-    output = subprocess.run(cmd, stdout=subprocess.PIPE).stdout.decode("utf-8")
+    # the csv output is just "width,height", no need to go through a json parser
+    output = subprocess.run(cmd, stdout=subprocess.PIPE).stdout
 
-    video_info = json.loads(output)
-    width = video_info["streams"][0]["width"]
-    height = video_info["streams"][0]["height"]
+    width, height = map(int, output.strip().split(b",")[:2])
 
     return width, height
 
@@ -100,15 +98,22 @@ def main():
 
     video_size = get_video_size(args.ffmpeg, args.input)
 
-    crop_parameters = calculate_crop_parameters(
+    crop_filter = calculate_crop_parameters(
         args.top_left, args.bottom_right, video_size, args.fps
     )
 
+    # generate an optimized palette and apply it in a single pass,
+    # the gif encoder is inferred from the output suffix
+    palette_filter = (
+        f"{crop_filter},split[a][b];"
+        "[a]palettegen=stats_mode=diff[p];"
+        "[b][p]paletteuse=dither=bayer:bayer_scale=5:diff_mode=rectangle"
+    )
+
     cmd = [
         args.ffmpeg,
         "-i", args.input,
-        *crop_parameters,
-        "-c:v", "gif",
+        "-filter_complex", palette_filter,
         args.output
     ]
 
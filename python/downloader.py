@@ -1,9 +1,14 @@
 import requests
+from requests.adapters import HTTPAdapter
 import logging
 import hashlib
+import sys
+import mmap
+import shutil
 from typing import List
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
@@ -33,8 +38,11 @@ class Downloader:
         resume: If True, resume downloading if the file already exists.
         max_retries: Maximum number of retries when downloading a file fails. Default is 3.
         max_workers: Maximum number of workers to download files concurrently. Default is 4.
-        chunk_size: Chunk size to download files. Default is 64KB.
+        chunk_size: Chunk size to download files. Default is 1MB.
         timeout: Timeout for downloading single file. Default is None.
+        http2: If True, download with an HTTP/2 `httpx.Client` (requires `httpx[http2]`), so
+            concurrent downloads from the same host are multiplexed over one connection. Default
+            is False.
 
     Example:
         >>> urls = ['https://example.com/file1.zip', 'https://example.com/file2.zip']
@@ -53,8 +61,9 @@ class Downloader:
             resume: bool = False,
             max_retries: int = 3,
             max_workers: int = 4,
-            chunk_size: int = 64 * 1024,
-            timeout: int = None
+            chunk_size: int = 1024 * 1024,
+            timeout: int = None,
+            http2: bool = False
     ) -> None:
         self.urls = urls
         self.outdir = Path(outdir)
@@ -65,8 +74,30 @@ class Downloader:
         self.max_workers = max_workers
         self.chunk_size = chunk_size
         self.timeout = timeout
+        self.http2 = http2
         self.failed = []
 
+        # Share one connection pool across workers so TCP/TLS connections are reused
+        if self.http2:
+            # httpx is an optional dependency, only needed for HTTP/2
+            import httpx
+            # follow redirects like requests does, release/S3/mirror URLs usually redirect
+            self.client = httpx.Client(
+                http2=True,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=max_workers, max_keepalive_connections=max_workers
+                ),
+                timeout=timeout
+            )
+        else:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=max_workers, pool_maxsize=max_workers * 2, max_retries=0
+            )
+            self.session.mount('https://', adapter)
+            self.session.mount('http://', adapter)
+
         self.outdir.mkdir(parents=True, exist_ok=True)
 
     def _get_names(self, names: List[str]) -> List[str]:
@@ -74,6 +105,31 @@ class Downloader:
             names = [url.split('/')[-1] for url in self.urls]
         return names
 
+    def _fetch(self, url: str, headers: dict | None, outpath: Path) -> bool:
+        """Append the response body of `url` to `outpath`.
+
+        Returns False if the server answers 416 (the requested range is not satisfiable).
+        """
+        if self.http2:
+            with self.client.stream('GET', url, headers=headers) as r:
+                if r.status_code == 416:
+                    return False
+                r.raise_for_status()
+                with open(outpath, 'ab') as f:
+                    for chunk in r.iter_bytes(self.chunk_size):
+                        f.write(chunk)
+            return True
+
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as r:
+            if r.status_code == 416:
+                return False
+            r.raise_for_status()
+            # Copy the raw stream in C with a reusable buffer, still decoding gzip/deflate
+            r.raw.decode_content = True
+            with open(outpath, 'ab') as f:
+                shutil.copyfileobj(r.raw, f, length=self.chunk_size)
+        return True
+
     def _download_single_url(self, url: str, name: str) -> None:
         outpath = self.outdir / name
         for i in range(self.max_retries):
@@ -83,14 +139,7 @@ class Downloader:
                 range_header = None
 
             try:
-                with requests.get(url, headers=range_header,
-                                  stream=True, timeout=self.timeout) as r:
-                    if r.status_code == 416:
-                        break
-                    r.raise_for_status()
-                    with open(outpath, 'ab') as f:
-                        for chunk in r.iter_content(self.chunk_size):
-                            f.write(chunk)
+                self._fetch(url, range_header, outpath)
                 break
             except Exception as e:
                 logging.info(
@@ -102,36 +151,91 @@ class Downloader:
 
         return url, name, True
 
-    def download(self) -> None:
+    def _download_pass(self, executor: ThreadPoolExecutor) -> None:
         logging.info(f'Start downloading {len(self.urls)} files...')
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            for i, res in enumerate(executor.map(self._download_single_url, self.urls, self.names)):
-                url, name, status = res
+        tasks = zip(self.urls, self.names)
+        finished = 0
+        # Keep a bounded number of futures in flight and report each one as soon as it
+        # finishes, instead of waiting on the slowest earlier download.
+        futures = {
+            executor.submit(self._download_single_url, url, name)
+            for url, name in islice(tasks, self.max_workers * 2)
+        }
+        while futures:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for fut in done:
+                url, name, status = fut.result()
+                finished += 1
                 if status:
-                    logging.info(f"{i+1:6d}/{len(self.urls)} | Success: {name}")
+                    logging.info(f"{finished:6d}/{len(self.urls)} | Success: {name}")
                 else:
                     self.failed.append((url, name))
-                    logging.info(f"{i+1:6d}/{len(self.urls)} | Failed: {name}")
+                    logging.info(f"{finished:6d}/{len(self.urls)} | Failed: {name}")
+            for url, name in islice(tasks, len(done)):
+                futures.add(executor.submit(self._download_single_url, url, name))
 
-        if self.failed and self.continue_on_error:
-            logging.warn(f"{len(self.failed)} downloads failed because of max retries reached.")
-            logging.warn(
-                f'{self.continue_on_error} continue_on_error left. Start failed downloads...'
-            )
-            self.continue_on_error -= 1
-            urls, names = zip(*self.failed)
-            self.urls = list(urls)
-            self.names = list(names)
-            self.failed = []
-            self.download()
+    def download(self) -> None:
+        # Retry failed downloads in a loop so the worker threads and the session are reused
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                self._download_pass(executor)
+                if not self.failed or not self.continue_on_error:
+                    break
 
-    def md5check(self, md5sums: List[str], chunksize: int = 1024**3 * 4) -> None:
-        """Check the MD5 checksum of the downloaded files.
+                logging.warning(
+                    f"{len(self.failed)} downloads failed because of max retries reached."
+                )
+                logging.warning(
+                    f'{self.continue_on_error} continue_on_error left. Start failed downloads...'
+                )
+                self.continue_on_error -= 1
+                urls, names = zip(*self.failed)
+                self.urls = list(urls)
+                self.names = list(names)
+                self.failed = []
+
+    def _file_digest(self, outpath: Path, chunksize: int, algo: str = 'md5') -> str | None:
+        if not outpath.exists():
+            return None
+        if algo == 'blake3':
+            # blake3 is an optional dependency, it hashes a memory map with SIMD and threads
+            import blake3
+            return blake3.blake3(max_threads=blake3.blake3.AUTO).update_mmap(outpath).hexdigest()
+
+        with open(outpath, 'rb') as f:
+            if sys.version_info >= (3, 11):
+                # file_digest hashes in C with a small reusable buffer
+                digest = hashlib.file_digest(f, algo)
+            else:
+                digest = hashlib.new(algo)
+                size = outpath.stat().st_size
+                # Hash straight from the page cache through a memory map, so no chunk is copied
+                # into a Python bytes object
+                if size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        if hasattr(mm, 'madvise'):
+                            mm.madvise(mmap.MADV_SEQUENTIAL)
+                        with memoryview(mm) as view:
+                            for offset in range(0, size, chunksize):
+                                digest.update(view[offset:offset + chunksize])
+        return digest.hexdigest().lower()
+
+    def md5check(
+            self, md5sums: List[str], chunksize: int = 1024**3 * 4, algo: str = 'md5'
+    ) -> None:
+        """Check the checksum of the downloaded files.
+
+        Files are hashed concurrently with `max_workers` threads. MD5 is the default because it
+        is what most vendors publish; when you compute the checksums yourself, a faster hash such
+        as `sha256` or `blake3` (requires the `blake3` package) can be used instead.
 
         Args:
-            md5sums: List of MD5 checksums of the downloaded files, in the same order as the
+            md5sums: List of checksums of the downloaded files, in the same order as the
                 downloaded urls.
-            chunksize: Chunk size to read files. Default is 4GB.
+            chunksize: Chunk size to hash memory-mapped files. Only used on Python < 3.11, where
+                `hashlib.file_digest` is not available. Default is 4GB.
+            algo: Hash algorithm, `blake3` or any name accepted by `hashlib.new`. Default is
+                `md5`.
 
         Example:
             >>> md5sums = ['md5sum1', 'md5sum2']
@@ -140,23 +244,26 @@ class Downloader:
         if len(md5sums) != len(self.urls):
             raise ValueError('The number of MD5 checksums does not match the number of URLs.')
 
-        logging.info('Start checking MD5 checksums...')
+        logging.info(f'Start checking {algo.upper()} checksums...')
         md5checks = []
-        for i, (md5sum, name) in enumerate(zip(md5sums, self.names)):
-            outpath = self.outdir / name
-            if outpath.exists():
-                with open(outpath, 'rb') as f:
-                    md5 = hashlib.md5()
-                    for chunk in iter(lambda: f.read(chunksize), b''):
-                        md5.update(chunk)
-                    md5 = md5.hexdigest().lower()
-                    md5checks.append(md5 == md5sum.lower())
+        outpaths = [self.outdir / name for name in self.names]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            md5s = executor.map(
+                lambda outpath: self._file_digest(outpath, chunksize, algo), outpaths
+            )
+            for i, (md5, md5sum, name) in enumerate(zip(md5s, md5sums, self.names)):
+                if md5 is None:
+                    logging.error(f"{i+1:6d}/{len(self.urls)} | File not found: {name}")
+                    continue
 
+                md5checks.append(md5 == md5sum.lower())
                 if md5 == md5sum.lower():
-                    logging.info(f"{i+1:6d}/{len(self.urls)} | MD5 checksum matched: {name}")
+                    logging.info(
+                        f"{i+1:6d}/{len(self.urls)} | {algo.upper()} checksum matched: {name}"
+                    )
                 else:
-                    logging.error(f"{i+1:6d}/{len(self.urls)} | MD5 checksum mismatch: {name}")
-            else:
-                logging.error(f"{i+1:6d}/{len(self.urls)} | File not found: {name}")
+                    logging.error(
+                        f"{i+1:6d}/{len(self.urls)} | {algo.upper()} checksum mismatch: {name}"
+                    )
 
         return md5checks
@@ -1,7 +1,54 @@
 import scanpy as sc
 import pandas as pd
+import numpy as np
+from scipy import sparse
+import pyarrow as pa
+import pyarrow.feather as paf
 import warnings
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _read_assay(assay_path: str, obs_names: pd.Index, var_names: pd.Index) -> np.ndarray:
+    """Read a genes x cells assay feather file as a cells x genes array
+
+    Every cell column is copied once straight into its row of the result, instead of building
+    a DataFrame and transposing it.
+    """
+    tbl = paf.read_table(assay_path)
+    gene_ids = pd.Index(tbl.column("gene_id").to_numpy(zero_copy_only=False))
+    # selecting columns of an arrow table is zero-copy, this also aligns cells to `.obs`
+    tbl = tbl.select(list(obs_names))
+    mat = np.stack([col.to_numpy() for col in tbl.columns])
+    if not gene_ids.equals(var_names):
+        idx = gene_ids.get_indexer(var_names)
+        if (idx < 0).any():
+            raise ValueError(
+                f"{(idx < 0).sum()} genes in rowData are missing from {assay_path}"
+            )
+        mat = mat[:, idx]
+    return mat
+
+
+def _write_assay(adata: sc.AnnData, layer: str | None, assay_path: str) -> None:
+    """Write `.X` (`layer` is None) or a layer of `adata` as a genes x cells feather file
+
+    Each cell row of the matrix becomes one column, so neither a dense DataFrame nor its
+    transpose is materialized. Sparse matrices are densified one cell at a time.
+    """
+    X = adata.X if layer is None else adata.layers[layer]
+    if sparse.issparse(X):
+        X = sparse.csr_matrix(X)
+        cells = (X[i].toarray().ravel() for i in range(X.shape[0]))
+    else:
+        X = np.asarray(X)
+        cells = (X[i] for i in range(X.shape[0]))
+
+    tbl = pa.Table.from_arrays(
+        [pa.array(adata.var_names.to_numpy())] + [pa.array(cell) for cell in cells],
+        names=["gene_id"] + list(adata.obs_names)
+    )
+    paf.write_feather(tbl, assay_path, compression="lz4")
 
 
 def read_h5ad4feather(feather_dirname: str) -> sc.AnnData:
@@ -36,14 +83,6 @@ def read_h5ad4feather(feather_dirname: str) -> sc.AnnData:
         elif ffile.startswith("rowData"):
             rowdata_file = ffile
 
-    # Read assays
-    assay_dict = {}
-    for afile, aname in zip(assay_files, assay_names):
-        tmp_assay = pd.read_feather(os.path.join(feather_dirname, afile))
-        tmp_assay.index = tmp_assay["gene_id"].to_list()
-        tmp_assay.drop(columns=["gene_id"], inplace=True)
-        assay_dict[aname] = tmp_assay.T
-
     # Read obs
     obs = pd.read_feather(os.path.join(feather_dirname, coldata_file))
     obs.index = obs["colnames"].to_list()
@@ -54,6 +93,14 @@ def read_h5ad4feather(feather_dirname: str) -> sc.AnnData:
     var.index = var["rownames"].to_list()
     var.drop(columns=["rownames"], inplace=True)
 
+    # Read assays, arrow releases the GIL while decoding so the files are read concurrently
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(assay_files)))) as executor:
+        assays = executor.map(
+            lambda afile: _read_assay(os.path.join(feather_dirname, afile), obs.index, var.index),
+            assay_files
+        )
+        assay_dict = dict(zip(assay_names, assays))
+
     # Make count/counts as X
     if "X" in assay_dict:
         X = assay_dict.pop("X", None)
@@ -91,15 +138,17 @@ def write_h5ad2feather(adata: sc.AnnData, feather_dirname: str) -> None:
     """
     if not os.path.exists(feather_dirname):
         os.makedirs(feather_dirname)
-    tmp_df = adata.to_df().T
-    tmp_df = tmp_df.reset_index().rename(columns={"index": "gene_id"})
-    tmp_df.to_feather(os.path.join(feather_dirname, "X_assay.feather"))
-
-    # Write layer to assay.feather
-    for layerk in adata.layers.keys():
-        tmp_df = adata.to_df(layerk).T
-        tmp_df = tmp_df.reset_index().rename(columns={"index": "gene_id"})
-        tmp_df.to_feather(os.path.join(feather_dirname, f"{layerk}_assay.feather"))
+
+    # Write X and layers to assay.feather, arrow releases the GIL so the files are written
+    # concurrently
+    layers = [None, *adata.layers.keys()]
+    assay_paths = [
+        os.path.join(feather_dirname, f"{'X' if layerk is None else layerk}_assay.feather")
+        for layerk in layers
+    ]
+    with ThreadPoolExecutor(max_workers=min(8, len(layers))) as executor:
+        list(executor.map(lambda layerk, path: _write_assay(adata, layerk, path),
+                          layers, assay_paths))
 
     # Write obs to colData.feather
     obs = adata.obs.reset_index().rename(columns={"index": "colnames"})
@@ -1,4 +1,116 @@
+import mmap
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+
+GTF_COLUMNS = ['seqname', 'source', 'feature', 'start',
+               'end', 'score', 'strand', 'frame', 'attribute']
+ATTRIBUTE_KEYS = ['gene_id', 'gene_name', 'gene_type',
+                  'transcript_id', 'transcript_name', 'transcript_type',
+                  'exon_number', 'exon_id']
+# low-cardinality columns, returned as `category` dtype
+CATEGORICAL_COLUMNS = ['seqname', 'source', 'feature', 'strand', 'frame']
+CATEGORICAL_ATTRIBUTE_KEYS = ['gene_type', 'transcript_type']
+# fixed column types, inferring them from the first block fails on e.g. chromosome `1` then `X`.
+# Categorical columns are dictionary encoded while parsing, without an intermediate string column
+GTF_COLUMN_TYPES = {
+    **{col: pa.string() for col in GTF_COLUMNS},
+    **{col: pa.dictionary(pa.int32(), pa.string()) for col in CATEGORICAL_COLUMNS},
+    'start': pa.int64(),
+    'end': pa.int64(),
+}
+
+
+def _header_offset(path: str) -> int:
+    """Find the byte offset after the leading `#` lines with one scan over a memory map
+
+    Compressed files never start with `#`, so they report 0 and rely on `_skip_comment`.
+    """
+    offset = 0
+    with open(path, 'rb') as f:
+        if not f.read(1):
+            return offset
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            while mm[offset:offset + 1] == b'#':
+                offset = mm.find(b'\n', offset) + 1
+                if offset == 0:
+                    return len(mm)
+    return offset
+
+
+def _skip_comment(row) -> str:
+    # comment lines inside the data (e.g. `###` in GFF3) have a single column, skip them and
+    # fail on any other malformed row
+    return 'skip' if row.text.startswith('#') else 'error'
+
+
+def _attribute_patterns(sep: str) -> dict:
+    """Build one RE2 pattern per attribute key, anchored at the start of a `key<sep>value` field"""
+    patterns = {}
+    for key in ATTRIBUTE_KEYS:
+        if sep == ' ':
+            value = r'"?(?P<exon_number>\d+)' if key == 'exon_number' else rf'"(?P<{key}>[^"]+)"'
+        else:
+            value = rf'(?P<{key}>[^;]+)'
+        patterns[key] = rf'(?:^|;\s*){key}{sep}{value}'
+    return patterns
+
+
+GTF_ATTRIBUTE_PATTERNS = _attribute_patterns(' ')
+GFF3_ATTRIBUTE_PATTERNS = _attribute_patterns('=')
+
+
+def _extract_attributes(attributes, patterns: dict) -> dict:
+    """Extract every attribute key from an Arrow string array
+
+    `pyarrow.compute.extract_regex` runs RE2 over the Arrow buffers, no Python string is created
+    per row.
+    """
+    extracted = {
+        key: pc.struct_field(pc.extract_regex(attributes, pattern=pattern), key)
+        for key, pattern in patterns.items()
+    }
+    for key in CATEGORICAL_ATTRIBUTE_KEYS:
+        extracted[key] = pc.dictionary_encode(extracted[key])
+    return extracted
+
+
+def _read_csv(source) -> pa.Table:
+    return pacsv.read_csv(
+        source,
+        read_options=pacsv.ReadOptions(column_names=GTF_COLUMNS),
+        parse_options=pacsv.ParseOptions(
+            delimiter='\t', quote_char=False, invalid_row_handler=_skip_comment
+        ),
+        convert_options=pacsv.ConvertOptions(column_types=GTF_COLUMN_TYPES)
+    )
+
+
+def _read_gff(path: str, attribute_patterns: dict) -> pd.DataFrame:
+    # start reading right after the header, skip_rows would fail once the header is larger than
+    # one CSV block (e.g. NCBI GFF3 with a `##sequence-region` line per scaffold)
+    offset = _header_offset(path)
+    if offset:
+        with pa.memory_map(path) as source:
+            source.seek(offset)
+            table = _read_csv(source)
+    else:
+        table = _read_csv(path)
+
+    # extract gene_id, gene_name, gene_type
+    # transcript_id, transcript_name, transcript_type
+    # exon_number, exon_id
+    attributes = _extract_attributes(table.column('attribute'), attribute_patterns)
+
+    # assemble all columns in their final order and convert to pandas once, instead of
+    # inserting the extracted columns one by one
+    names = GTF_COLUMNS[:8] + ATTRIBUTE_KEYS + ['attribute']
+    columns = [
+        attributes[name] if name in attributes else table.column(name) for name in names
+    ]
+    return pa.table(columns, names=names).to_pandas(split_blocks=True, self_destruct=True)
 
 
 def read_gtf(gtf_path: str) -> pd.DataFrame:
@@ -12,24 +124,10 @@ def read_gtf(gtf_path: str) -> pd.DataFrame:
     Returns
     -------
     gtf : pd.DataFrame
-        GTF file as a pandas DataFrame.
+        GTF file as a pandas DataFrame. Low-cardinality columns (seqname, source,
+        feature, strand, frame, gene_type, transcript_type) are of `category` dtype.
     """
-    gtf = pd.read_csv(gtf_path, sep='\t', comment='#', header=None)
-    gtf.columns = ['seqname', 'source', 'feature', 'start',
-                   'end', 'score', 'strand', 'frame', 'attribute']
-
-    # extract gene_id, gene_name, gene_type
-    # transcript_id, transcript_name, transcript_type
-    # exon_number, exon_id
-    gtf.insert(8, 'gene_id', gtf['attribute'].str.extract(r'gene_id "([^"]+)"'))
-    gtf.insert(9, 'gene_name', gtf['attribute'].str.extract(r'gene_name "([^"]+)"'))
-    gtf.insert(10, 'gene_type', gtf['attribute'].str.extract(r'gene_type "([^"]+)"'))
-    gtf.insert(11, 'transcript_id', gtf['attribute'].str.extract(r'transcript_id "([^"]+)"'))
-    gtf.insert(12, 'transcript_name', gtf['attribute'].str.extract(r'transcript_name "([^"]+)"'))
-    gtf.insert(13, 'transcript_type', gtf['attribute'].str.extract(r'transcript_type "([^"]+)"'))
-    gtf.insert(14, 'exon_number', gtf['attribute'].str.extract(r'exon_number (\d+)'))
-    gtf.insert(15, 'exon_id', gtf['attribute'].str.extract(r'exon_id "([^"]+)"'))
-    return gtf
+    return _read_gff(gtf_path, GTF_ATTRIBUTE_PATTERNS)
 
 
 def read_gff3(gff3_path: str) -> pd.DataFrame:
@@ -43,21 +141,7 @@ def read_gff3(gff3_path: str) -> pd.DataFrame:
     Returns
     -------
     gff3 : pd.DataFrame
-        GFF3 file as a pandas DataFrame.
+        GFF3 file as a pandas DataFrame. Low-cardinality columns (seqname, source,
+        feature, strand, frame, gene_type, transcript_type) are of `category` dtype.
     """
-    gtf = pd.read_csv(gff3_path, sep='\t', comment='#', header=None)
-    gtf.columns = ['seqname', 'source', 'feature', 'start',
-                   'end', 'score', 'strand', 'frame', 'attribute']
-
-    # extract gene_id, gene_name, gene_type
-    # transcript_id, transcript_name, transcript_type
-    # exon_number, exon_id
-    gtf.insert(8, 'gene_id', gtf['attribute'].str.extract(r'gene_id=([^;]+)'))
-    gtf.insert(9, 'gene_name', gtf['attribute'].str.extract(r'gene_name=([^;]+)'))
-    gtf.insert(10, 'gene_type', gtf['attribute'].str.extract(r'gene_type=([^;]+)'))
-    gtf.insert(11, 'transcript_id', gtf['attribute'].str.extract(r'transcript_id=([^;]+)'))
-    gtf.insert(12, 'transcript_name', gtf['attribute'].str.extract(r'transcript_name=([^;]+)'))
-    gtf.insert(13, 'transcript_type', gtf['attribute'].str.extract(r'transcript_type=([^;]+)'))
-    gtf.insert(14, 'exon_number', gtf['attribute'].str.extract(r'exon_number=(\d+)'))
-    gtf.insert(15, 'exon_id', gtf['attribute'].str.extract(r'exon_id=([^;]+)'))
-    return gtf
+    return _read_gff(gff3_path, GFF3_ATTRIBUTE_PATTERNS)
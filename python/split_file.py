@@ -1,23 +1,51 @@
+import os
+import mmap
 import hashlib
 import argparse
 from pathlib import Path
 
 
-def calculate_md5(file_path):
-    """计算文件的 MD5 值"""
-    md5_hash = hashlib.md5()
-    with file_path.open('rb') as f:
-        for chunk in iter(lambda: f.read(4096), b''):
-            md5_hash.update(chunk)
-    return md5_hash.hexdigest()
+def new_hash(hash_algo='md5'):
+    """创建哈希对象，blake3 需要额外安装 blake3 包"""
+    if hash_algo == 'blake3':
+        import blake3
+        return blake3.blake3()
+    return hashlib.new(hash_algo)
 
 
-def split_file(file_path, chunk_size, output_dir):
+def copy_range(src_fd, dst_file, offset, length, data):
+    """
+    把源文件 offset 处 length 字节复制到 dst_file
+    优先使用 os.copy_file_range 在内核中完成复制（支持的文件系统上还会直接共享数据块），
+    不支持时（如 macOS、跨文件系统的旧内核）退回到写入 data
     """
-    将文件按指定大小分割，并在指定输出目录生成分割文件和 MD5 校验文件
+    if hasattr(os, 'copy_file_range'):
+        try:
+            copied = 0
+            while copied < length:
+                n = os.copy_file_range(
+                    src_fd, dst_file.fileno(), length - copied, offset + copied
+                )
+                if n == 0:
+                    break
+                copied += n
+            if copied == length:
+                return
+        except OSError:
+            pass
+        dst_file.seek(0)
+        dst_file.truncate()
+    dst_file.write(data)
+
+
+def split_file(file_path, chunk_size, output_dir, hash_algo='md5'):
+    """
+    将文件按指定大小分割，并在指定输出目录生成分割文件和校验文件
     :param file_path: 源文件路径 (Path 对象)
     :param chunk_size: 每个分块的大小（以字节为单位）
     :param output_dir: 输出文件夹路径 (Path 对象)
+    :param hash_algo: 校验算法，md5（默认，兼容已有的 .md5 文件）、sha256 或 blake3。
+        sha256 和 blake3 有硬件/SIMD 加速，比 md5 快得多
     """
     if not file_path.exists():
         print(f"文件 {file_path} 不存在")
@@ -27,44 +55,55 @@ def split_file(file_path, chunk_size, output_dir):
     output_dir.mkdir(parents=True, exist_ok=True)
 
     part_files = []
+    part_hashes = []
     base_name = file_path.name
 
-    # 分割文件
+    # 分割文件，只读一遍源文件，同时计算每个分块和原始文件的校验值
+    # 源文件通过 mmap 映射，校验直接读取页缓存，分块数据不再复制到 Python 的 bytes 中
+    original_hash = new_hash(hash_algo)
+    file_size = file_path.stat().st_size
     with file_path.open('rb') as f:
-        part_number = 1
-        while chunk := f.read(chunk_size):
-            part_file_name = output_dir / f"{base_name}.part{part_number:02}"
-            with part_file_name.open('wb') as part_file:
-                part_file.write(chunk)
-            part_files.append(part_file_name)
-            part_number += 1
-
-    # 生成分割文件的 MD5 校验文件
-    md5_file_path = output_dir / f"{base_name}.md5"
-    with md5_file_path.open('w') as md5_file:
-        for part_file in part_files:
-            part_md5 = calculate_md5(part_file)
-            md5_file.write(f"{part_md5}  {part_file.name}\n")
-
-    # 生成原始文件的 MD5 校验文件
-    original_md5 = calculate_md5(file_path)
-    original_md5_file_path = output_dir / "original.md5"
-    with original_md5_file_path.open('w') as original_md5_file:
-        original_md5_file.write(f"{original_md5}  {base_name}\n")
+        if file_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                for part_number, offset in enumerate(range(0, file_size, chunk_size), start=1):
+                    part_file_name = output_dir / f"{base_name}.part{part_number:02}"
+                    with view[offset:offset + chunk_size] as chunk:
+                        original_hash.update(chunk)
+                        part_hash = new_hash(hash_algo)
+                        part_hash.update(chunk)
+                        with part_file_name.open('wb') as part_file:
+                            copy_range(f.fileno(), part_file, offset, len(chunk), chunk)
+                    part_hashes.append(part_hash.hexdigest())
+                    part_files.append(part_file_name)
+
+    # 生成分割文件的校验文件
+    hash_file_path = output_dir / f"{base_name}.{hash_algo}"
+    with hash_file_path.open('w') as hash_file:
+        for part_file, part_hash in zip(part_files, part_hashes):
+            hash_file.write(f"{part_hash}  {part_file.name}\n")
+
+    # 生成原始文件的校验文件
+    original_hash_file_path = output_dir / f"original.{hash_algo}"
+    with original_hash_file_path.open('w') as original_hash_file:
+        original_hash_file.write(f"{original_hash.hexdigest()}  {base_name}\n")
 
     print(f"文件已分割为 {len(part_files)} 个部分，文件输出到: {output_dir}")
-    print(f"分块文件的 MD5 校验文件: {md5_file_path}")
-    print(f"原始文件的 MD5 校验值保存为: {original_md5_file_path}")
+    print(f"分块文件的 {hash_algo.upper()} 校验文件: {hash_file_path}")
+    print(f"原始文件的 {hash_algo.upper()} 校验值保存为: {original_hash_file_path}")
 
 
 def main():
-    parser = argparse.ArgumentParser(description="将大文件按指定大小分割，并生成 MD5 校验文件")
+    parser = argparse.ArgumentParser(description="将大文件按指定大小分割，并生成校验文件")
     parser.add_argument("file", type=Path, help="要分割的文件路径")
     parser.add_argument("chunk_size", type=int, help="每个分块的大小（单位：字节）")
     parser.add_argument("output_dir", type=Path, help="输出文件夹路径")
+    parser.add_argument(
+        "--hash", choices=["md5", "sha256", "blake3"], default="md5",
+        help="校验算法，默认 md5；sha256 和 blake3 更快，blake3 需要安装 blake3 包"
+    )
     args = parser.parse_args()
 
-    split_file(args.file, args.chunk_size, args.output_dir)
+    split_file(args.file, args.chunk_size, args.output_dir, args.hash)
 
 
 if __name__ == "__main__":